@@ -4,9 +4,10 @@ in the Microsoft SQL database.
 
 This utility offers five commands:
 
-- new-experiment [filename]:
+- new-experiment [filename ...]:
     This adds a new experiment to the database using the
-    parameters given in the config file supplied
+    parameters given in each config file supplied. Several
+    files are added concurrently
 
 - delete-experiment [filename]:
     This removes an experiment from the database using the
@@ -14,8 +15,10 @@ This utility offers five commands:
 
 - list-backups:
     This prints a list of every available backup file with the date
-    and time that they were created. There are a number of flags
-    that can be used to filter these results:
+    and time that they were created. The listing is read from an
+    index of the backup directory kept in ~/.cache/exp_backups.sqlite,
+    which is refreshed whenever a backup is added or removed. There
+    are a number of flags that can be used to filter these results:
 
     --start : an ISO 8601* datetime format for the earliest date and
         time to search from
@@ -24,6 +27,7 @@ This utility offers five commands:
     --regex : this is a Pearl-style regular expression for matching
         the filename (not including path or extension). The regex
         must be surrounded with a '/' character
+    --limit : only list this many of the most recent matching backups
 
     Sample querys:
         > python3 experiment_setup.py list-backups --start 2023-02-11 --end 2023-04-01
@@ -36,6 +40,9 @@ This utility offers five commands:
         > python3 experiment_setup.py list-backups --regex /.*50_Percent.*/
         This will list all backups containing the substring '50_Percent'
 
+        > python3 experiment_setup.py list-backups --limit 5
+        This will list the 5 most recent backups
+
     *ISO 8601 means one of the following two date formats:
     1. '2023-04-15' for the 15th of April 2023
     2. '2023-04-15T16:43:02' for 4:43:02PM on the 15th of April 2023
@@ -47,21 +54,92 @@ This utility offers five commands:
     This prints the help message you are currently looking at :)
 """
 
-import builtins
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import heapq
+import operator
+import os
 import pathlib
 import pyodbc
+import queue
 import re
+import sqlite3
 import sys
+import time
 import tomllib
 
 
 # Some (constant) globals
 BACKUP_DIRECTORY = pathlib.Path("C:\\something")
+BACKUP_INDEX_PATH = pathlib.Path.home() / ".cache" / "exp_backups.sqlite"
 DB_ADDR = "test"
 DB_NAME = "test"
 DB_UID = "user"
 DB_PWD = "password"
+DB_POOL_SIZE = 8
+
+
+# ODBC connection string, built once rather than for every connection
+_DSN = (
+    "DRIVER={ODBC Driver 18 for SQL Server};"
+    f"SERVER={DB_ADDR};"
+    f"DATABASE={DB_NAME};"
+    f"UID={DB_UID};"
+    f"PWD={DB_PWD}"
+)
+
+
+# Let the ODBC driver manager cache the underlying environment and
+# connection handles as well. This must be set before the first connect
+pyodbc.pooling = True
+
+# Idle connections which can be reused by later database commands
+_POOL = queue.Queue(maxsize=DB_POOL_SIZE)
+
+# Conversions used by fix_sql_value_types, keyed on the value's type.
+# Anything not listed here is simply converted with str()
+_SQL_VALUE_CONVERTERS = {
+    bool: lambda value: str(int(value)),
+}
+
+# Defaults for the list-backups search constraints. These are open-ended
+# rather than real dates, since converting far-off naive datetimes to
+# timestamps fails on Windows
+_EARLIEST_TIMESTAMP = float("-inf")
+_LATEST_TIMESTAMP   = float("inf")
+_DEFAULT_REGEX      = re.compile(r".*")
+
+
+def _acquire_connection() -> pyodbc.Connection:
+    """
+    Takes an idle connection from the pool, or opens a new one if
+    there aren't any available
+    """
+    try:
+        return _POOL.get_nowait()
+    except queue.Empty:
+        return pyodbc.connect(_DSN, autocommit=True)
+
+
+def _release_connection(conn: pyodbc.Connection):
+    """
+    Returns a connection to the pool, closing it if the pool is full
+    """
+    try:
+        _POOL.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+
+def _discard_connection(conn: pyodbc.Connection):
+    """
+    Closes a connection which may be broken instead of returning it
+    to the pool. Closing also rolls back any uncommitted changes
+    """
+    try:
+        conn.close()
+    except pyodbc.Error:
+        pass # The caller is already raising the more useful error
 
 
 def handle_database(func):
@@ -69,27 +147,40 @@ def handle_database(func):
     Decorator function for any function which connects to the database
 
     This decorator handles database connections, commits, and
-    disconnection. It should be applied to every function which wants
-    to make changes to the database.
+    rollbacks. Connections are taken from (and returned to) a
+    module-level pool, so repeated commands in the same process reuse
+    an already authenticated session. A connection is only returned
+    to the pool after a clean commit; if anything fails it is closed
+    instead, since the session may be broken. This decorator should be
+    applied to every function which wants to make changes to the
+    database.
+
+    Connections are in autocommit mode, so single statements don't
+    need a separate commit. A function which must make several changes
+    atomically should set `cursor.connection.autocommit = False` before
+    making them; the decorator then commits (or rolls back) at the end.
 
     Notes:
     Any function which uses this wrapper must take a named cursor
     parameter
     """
     def wrapper(*args):
-        conn = pyodbc.connect(
-            "DRIVER={ODBC Driver 18 for SQL Server};"
-            f"SERVER={DB_ADDR}"
-            f"DATABASE={DB_NAME}"
-            f"UID={DB_UID}"
-            f"PWD={DB_PWD}"
-        )
-        cursor = conn.cursor()
+        conn = _acquire_connection()
 
-        result = func(*args, cursor=cursor)
+        try:
+            cursor = conn.cursor()
+            result = func(*args, cursor=cursor)
+            cursor.close()
 
-        conn.commit()
-        conn.close()
+            # Pooled connections must be back in autocommit mode
+            if not conn.autocommit:
+                conn.commit()
+                conn.autocommit = True
+        except BaseException:
+            _discard_connection(conn)
+            raise
+
+        _release_connection(conn)
 
         return result
 
@@ -100,24 +191,16 @@ def handle_database(func):
 
 def fix_sql_value_types(value):
     """
-    Converts Python values to their appropriate SQL types.
+    Converts Python values to the text stored in ParamValueTxt.
 
     This means converting boolean values into integer values,
-    and then all values are converted to strings.
-    
-    THIS FUNCTION MUST BE USED FOR ANY VALUE INSERTED INTO THE
-    DATABASE.
+    and then all values are converted to strings. Quoting is left
+    to pyodbc, since every value is bound as a query parameter.
 
     args:
     - value: the value whose type will be converted.
     """
-    match type(value):
-        case builtins.bool:
-            return str(int(value))
-        case builtins.str:
-            return "'" + value + "'"
-        case _:
-            return str(value)
+    return _SQL_VALUE_CONVERTERS.get(type(value), str)(value)
 
 
 def get_experiment_id(cursor: pyodbc.Cursor, user_defined_id: str) -> int:
@@ -131,9 +214,31 @@ def get_experiment_id(cursor: pyodbc.Cursor, user_defined_id: str) -> int:
     returns:
     the numeric experiment ID, or throws an error
     """
-    query = "SELECT * FROM Experiments WHERE UserDefinedID = " + user_defined_id
+    query = "SELECT ExperimentID FROM Experiments WHERE UserDefinedID = ?"
+
+    return cursor.execute(query, user_defined_id).fetchval()
+
+
+def load_config(filepath: str, tables: [str]) -> {str : dict}:
+    """
+    Reads an experiment config file and checks that it contains the
+    tables which the caller uses
+
+    args:
+    - filepath: the path of the TOML config file
+    - tables: the names of the tables which the caller uses
+
+    returns:
+    the parsed config file, or throws an error if any of the tables
+    are missing from it
+    """
+    with open(filepath, "rb") as f:
+        config = tomllib.load(f)
 
-    return cursor.execute(query).fetchone()
+    if missing := [table for table in tables if table not in config]:
+        raise KeyError(f"config file '{filepath}' is missing the tables {missing}")
+
+    return config
 
 
 def parse_arguments(argument_list: [str]) -> ([str], {str : str}):
@@ -146,67 +251,182 @@ def parse_arguments(argument_list: [str]) -> ([str], {str : str}):
     """
     sequential = []
     flags_dict = {}
-    index = 0
-
-    while index < len(argument_list):
-        if (arg := argument_list[index])[0] == "-":
-            if index + 1 < len(argument_list):
-                flags_dict[arg] = argument_list[index + 1]
-            else:
-                raise EOFError(f"flag '{arg}' has no corresponding value")
-
-            index += 2
+    arguments  = iter(argument_list)
+
+    for arg in arguments:
+        if arg.startswith("-"):
+            try:
+                flags_dict[arg] = next(arguments)
+            except StopIteration:
+                raise EOFError(f"flag '{arg}' has no corresponding value") from None
         else:
             sequential.append(arg)
-            index += 1
 
     return sequential, flags_dict
 
 
 """ Commands """
 
-@handle_database
-def create_new_experiment(arguments: [str], cursor: pyodbc.Cursor = None):
+def create_new_experiment(arguments: [str]):
     """
-    Adds a new experiment to the database
-    
+    Adds a new experiment to the database for each config file given
+
     args:
     - arguments: the sequential arguments from the command line
         (not including the method name 'new-experiment')
-    - cursor: a named parameter which is passed to the function
-        by the @handle_database decorator, which represents a
-        handle to the database
+
+    Every config file is read and checked before anything is sent to
+    the database. When several are given they are split into batches
+    which are inserted concurrently, each batch on its own pooled
+    connection. Each experiment is committed in its own transaction,
+    and a batch stops at its first failure. If anything fails when
+    several files are given, the error lists which config files were
+    committed, which failed and which were never attempted.
+    """
+
+    if len(arguments) == 0:
+        raise SyntaxError(f"no config files given to new-experiment\n\n{HELP_MESSAGE}")
+
+    if duplicates := sorted({filepath for filepath in arguments if arguments.count(filepath) > 1}):
+        raise SyntaxError(f"config files given more than once: {duplicates}\n\n{HELP_MESSAGE}")
+
+    experiments = [(filepath, _read_experiment_config(filepath)) for filepath in arguments]
+
+    # A single experiment has nothing else to report on, so just let
+    # its error through as it is
+    if len(experiments) == 1:
+        _create_experiments(experiments, [])
+        return
+
+    workers   = min(DB_POOL_SIZE, len(experiments))
+    batches   = [experiments[i::workers] for i in range(workers)]
+    committed = [[] for _ in batches]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_create_experiments, batch, batch_committed)
+            for batch, batch_committed in zip(batches, committed)
+        ]
+
+    failed = {}
+    not_attempted = set()
+    failed_after_commit = []
+
+    for batch, batch_committed, future in zip(batches, committed, futures):
+        if (error := future.exception()) is None:
+            continue
+
+        # Batches are inserted in order, so the first uncommitted file
+        # is the one which failed. If every file was committed, the
+        # error came from tidying up the connection afterwards
+        if uncommitted := [filepath for filepath, _ in batch[len(batch_committed):]]:
+            failed[uncommitted[0]] = error
+            not_attempted.update(uncommitted[1:])
+        else:
+            failed_after_commit.append(error)
+
+    if failed or failed_after_commit:
+        committed = {filepath for batch_committed in committed for filepath in batch_committed}
+
+        sections = {
+            "committed":     [f"- '{filepath}'" for filepath in arguments if filepath in committed],
+            "failed":        [f"- '{filepath}': {failed[filepath]!r}" for filepath in arguments if filepath in failed],
+            "not attempted": [f"- '{filepath}'" for filepath in arguments if filepath in not_attempted],
+            "failed after commit": [f"- {error!r}" for error in failed_after_commit],
+        }
+
+        report = ["Not every experiment could be added"]
+        for heading, lines in sections.items():
+            if lines:
+                report += [f"{heading}:", *lines]
+
+        first_error = next(iter(failed.values()), None) or failed_after_commit[0]
+        raise RuntimeError("\n".join(report)) from first_error
+
+
+def _read_experiment_config(filepath: str) -> dict:
+    """
+    Reads an experiment config file and checks that it can be inserted
+
+    args:
+    - filepath: the path of the experiment's config file
 
     This method will raise an exception if the config file doesn't
     contain the required parameters
     """
+    config = load_config(filepath, ["info", "parameters"])
 
-    if len(arguments) != 1:
-        raise SyntaxError(f"too many arguments given to new-experiment\n\n{HELP_MESSAGE}")
+    if "UserDefinedID" not in config["info"]:
+        raise KeyError(f"config file '{filepath}' has no UserDefinedID in [info]")
+
+    return config
+
+
+@handle_database
+def _create_experiments(experiments: [(str, dict)], committed: [str], cursor: pyodbc.Cursor = None):
+    """
+    Adds a batch of experiments to the database, committing each one
+    in its own transaction
+
+    The same cursor is used for every experiment, so its prepared
+    statements and parameter buffers are reused between inserts.
+
+    args:
+    - experiments: (filepath, config) pairs from _read_experiment_config
+    - committed: a list which each filepath is appended to once its
+        experiment has been committed, so that it's known how far
+        through the batch got if it fails
+    - cursor: a named parameter which is passed to the function
+        by the @handle_database decorator, which represents a
+        handle to the database
+    """
+    cursor.connection.autocommit = False
+    cursor.fast_executemany = True
+
+    for filepath, config in experiments:
+        _insert_experiment(cursor, config)
+        cursor.connection.commit()
+        committed.append(filepath)
 
-    with open(arguments, "rb") as f:
-        config = tomllib.load(f)
 
-    # Add experiment info
-    info_field_names  = config["info"].keys()
-    info_field_values = [fix_sql_value_types(v) for v in config["info"].values()]
+def _insert_experiment(cursor: pyodbc.Cursor, config: dict):
+    """
+    Adds a single experiment to the database
+
+    args:
+    - cursor: the database cursor
+    - config: the experiment's config, from _read_experiment_config
+    """
+    # Add experiment info. Column names can't be bound as parameters, so
+    # they're quoted as SQL Server identifiers (which also allows names
+    # like 'Order' or 'Key' that are reserved words)
+    info_field_names = ", ".join(
+        "[" + field_name.replace("]", "]]") + "]" for field_name in config["info"]
+    )
+    placeholders     = ", ".join("?" * len(config["info"]))
     cursor.execute(
         f"INSERT INTO Experiments ({info_field_names}) "
-        f"VALUES ({info_field_values})"
+        f"VALUES ({placeholders})",
+        list(config["info"].values())
     )
 
     # get experiment ID
-    user_defined_id = config["info"]["UserdefinedID"]
+    user_defined_id = config["info"]["UserDefinedID"]
     experiment_id = get_experiment_id(cursor, user_defined_id)
 
-    # Add experiment parameters
-    parameters = list(config["parameters"].items())
-    cursor.execute(
-        "INSERT INTO ExperimentParameters "
-        "(ExperimentID, ParameterName, ParamValueTxt) VALUES"
-        f"({experiment_id}, ?, ?)",
-        parameters
-    )
+    # Add experiment parameters (sent as a single parameter array)
+    parameters = [
+        (experiment_id, name, fix_sql_value_types(value))
+        for name, value in config["parameters"].items()
+    ]
+
+    # executemany rejects an empty sequence, e.g. from an empty [parameters]
+    if parameters:
+        cursor.executemany(
+            "INSERT INTO ExperimentParameters "
+            "(ExperimentID, ParameterName, ParamValueTxt) VALUES (?, ?, ?)",
+            parameters
+        )
 
 
 @handle_database
@@ -229,14 +449,166 @@ def delete_experiment(arguments: [str], cursor: pyodbc.Cursor = None):
     if len(arguments) != 1:
         raise SyntaxError(f"too many arguments given to new-experiment\n\n{HELP_MESSAGE}")
 
-    with open(arguments, "rb") as f:
-        config = tomllib.load(f)
+    config = load_config(arguments[0], ["info"])
 
     user_defined_id = config["info"]["UserDefinedID"]
-    experiment_id = get_experiment_id(cursor, user_defined_id)
 
-    cursor.execute("DELETE FROM Experiments WHERE UserDefinedID = ?", user_defined_id)
-    cursor.execute("DELETE FROM ExperimentParameters WHERE ExperimentID = ?", experiment_id)
+    # Both deletes are sent as one batch, so this is a single round-trip.
+    # They still have to succeed or fail together
+    cursor.connection.autocommit = False
+    cursor.execute(
+        "DELETE FROM ExperimentParameters WHERE ExperimentID IN "
+        "(SELECT ExperimentID FROM Experiments WHERE UserDefinedID = ?); "
+        "DELETE FROM Experiments WHERE UserDefinedID = ?;",
+        user_defined_id,
+        user_defined_id
+    )
+
+    # The second row count is for the Experiments delete
+    if not cursor.nextset() or cursor.rowcount == 0:
+        raise LookupError(f"no experiment with UserDefinedID '{user_defined_id}'")
+
+
+def _open_backup_index() -> sqlite3.Connection:
+    """
+    Opens the on-disk index of the backup directory, rescanning the
+    directory first if it has changed since it was last indexed.
+
+    The directory's modification time changes whenever a backup is
+    added, removed or renamed, so repeated listings only need to
+    query the index rather than stat every backup file again.
+    """
+    BACKUP_INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+    index = sqlite3.connect(BACKUP_INDEX_PATH)
+
+    try:
+        _refresh_backup_index(index)
+    except BaseException:
+        index.close()
+        raise
+
+    return index
+
+
+def _refresh_backup_index(index: sqlite3.Connection):
+    """
+    Rescans the backup directory into the index if the directory has
+    been modified since it was last indexed
+
+    args:
+    - index: the connection to the on-disk index
+    """
+    global BACKUP_DIRECTORY
+
+    index.executescript(
+        "CREATE TABLE IF NOT EXISTS backups "
+        "(directory TEXT, path TEXT PRIMARY KEY, stem TEXT, ctime REAL);"
+        "CREATE INDEX IF NOT EXISTS backups_by_ctime ON backups (directory, ctime);"
+        "CREATE TABLE IF NOT EXISTS scans (directory TEXT PRIMARY KEY, mtime INTEGER);"
+    )
+
+    directory = str(BACKUP_DIRECTORY)
+    mtime = os.stat(directory).st_mtime_ns
+    last_scan = index.execute(
+        "SELECT mtime FROM scans WHERE directory = ?", (directory,)
+    ).fetchone()
+
+    if last_scan is None or last_scan[0] != mtime:
+        with index, os.scandir(directory) as entries:
+            index.execute("DELETE FROM backups WHERE directory = ?", (directory,))
+            index.executemany(
+                "INSERT OR REPLACE INTO backups VALUES (?, ?, ?, ?)",
+                (
+                    (directory, entry.path, entry.name[:-4], entry.stat().st_ctime)
+                    for entry in entries
+                    if len(entry.name) > 4 and entry.name.endswith(".bak")
+                )
+            )
+            index.execute("INSERT OR REPLACE INTO scans VALUES (?, ?)", (directory, mtime))
+
+
+def _scan_backups(start: float, end: float, regex: re.Pattern):
+    """
+    Lazily yields a (creation time, path) pair for every matching
+    backup file by scanning the backup directory directly. This is
+    used when the on-disk index can't be.
+
+    args:
+    - start: the earliest creation time to include
+    - end: the latest creation time to include
+    - regex: the pattern which the filename's stem must match
+    """
+    global BACKUP_DIRECTORY
+
+    match = regex.match
+
+    # Filter on the filename first so that only matching backups are stat'd
+    with os.scandir(BACKUP_DIRECTORY) as entries:
+        for entry in entries:
+            name = entry.name
+
+            # A file called just '.bak' has no stem, so isn't a backup
+            if len(name) <= 4 or not name.endswith(".bak") or not match(name[:-4]):
+                continue
+
+            if start <= (creation_date := entry.stat().st_ctime) <= end:
+                yield creation_date, entry.path
+
+
+def _iter_backups(flags: {str : str}):
+    """
+    Lazily yields a (creation time, path) pair for every backup file
+    which matches the command line flags supplied.
+
+    args:
+    - flags: the key/value flags from the command line arguments
+    """
+    global BACKUP_DIRECTORY
+
+    # Get search constraints from flags
+    if "--start" in flags:
+        start = datetime.fromisoformat(flags["--start"]).timestamp()
+    else:
+        start = _EARLIEST_TIMESTAMP
+
+    if "--end" in flags:
+        end = datetime.fromisoformat(flags["--end"]).timestamp()
+    else:
+        end = _LATEST_TIMESTAMP
+
+    if "--regex" in flags:
+        regex = re.compile(flags["--regex"][1:-1]) # Simply strip the slashes
+    else:
+        regex = _DEFAULT_REGEX
+
+    query = "SELECT ctime, path FROM backups WHERE directory = ? AND ctime BETWEEN ? AND ?"
+    index = None
+
+    try:
+        index = _open_backup_index()
+
+        # The default regex matches everything, so it isn't worth calling
+        # back into Python for every row
+        if regex is not _DEFAULT_REGEX:
+            match = regex.match
+            index.create_function(
+                "matches_regex", 1, lambda stem: match(stem) is not None, deterministic=True
+            )
+            query += " AND matches_regex(stem)"
+
+        rows = index.execute(query, (str(BACKUP_DIRECTORY), start, end))
+    except (sqlite3.Error, OSError):
+        if index is not None:
+            index.close()
+
+        # The index is only a cache, so scan the directory instead
+        yield from _scan_backups(start, end, regex)
+        return
+
+    try:
+        yield from rows
+    finally:
+        index.close()
 
 
 def list_database_backups(flags: {str : str}):
@@ -252,22 +624,22 @@ def list_database_backups(flags: {str : str}):
     """
     raise NotImplementedError("I don't yet know where backups are stored")
 
-    global BACKUP_DIRECTORY
-    backup_files = []
+    backups = _iter_backups(flags)
 
-    # Get search constraints from flags
-    start = datetime.fromisoformat(flags.get("--start", "1970-01-01T00:00:00")).timestamp()
-    end   = datetime.fromisoformat(flags.get("--end", "9999-01-01T00:00:00")).timestamp()
-    regex = re.compile(flags.get("--regex", r"/.*/")[1:-1]) # Simply strip the slashes
+    if "--limit" in flags:
+        if not (limit := flags["--limit"]).isdecimal() or int(limit) == 0:
+            raise SyntaxError(f"--limit must be a positive integer\n\n{HELP_MESSAGE}")
 
-    for filepath in BACKUP_DIRECTORY.iterdir():
-        if start <= (creation_date := filepath.stat().st_ctime) <= end:
-            if filepath.suffix == ".bak" and regex.match(filepath.stem):
-                backup_files.append((filepath, creation_date))
+        # Only keep the most recent backups rather than sorting all of them
+        backups = reversed(heapq.nlargest(int(limit), backups))
+    else:
+        backups = sorted(backups, key=operator.itemgetter(0))
 
-    for filepath, creation_date in sorted(backup_files, key=lambda p : p[1]):
-        creation_date = datetime.fromtimestamp(creation_date).isoformat()
-        print(f"{creation_date} - '{filepath}'")
+    # Written in one go rather than taking the stdout lock for every line
+    sys.stdout.write("".join(
+        f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(creation_date))} - '{filepath}'\n"
+        for creation_date, filepath in backups
+    ))
 
 
 @handle_database
@@ -276,12 +648,13 @@ def restore_from_backup(arguments: [str], cursor: pyodbc.Cursor = None):
     Restores an experiment from a specific backup file
 
     args:
-    - arguments: the sequential args from the command line
+    - arguments: the sequential arguments from the command line
+        (not including the method name 'restore-from-backup')
     """
     global BACKUP_DIRECTORY
 
-    if len(arguments) == 2:
-        backup_filepath = pathlib.Path(arguments[1])
+    if len(arguments) == 1:
+        backup_filepath = pathlib.Path(arguments[0])
     else:
         raise SyntaxError(
             "Bad syntax - expected the following\n"
@@ -302,23 +675,44 @@ def restore_from_backup(arguments: [str], cursor: pyodbc.Cursor = None):
         print("The database has not been changed. Goodbye :)")
 
 
+def _without_arguments(command: str, handler):
+    """
+    Wraps the handler of a command which only takes flags, so that any
+    sequential arguments given to it are rejected rather than ignored
+
+    args:
+    - command: the name of the command, for the error message
+    - handler: the function to call with the flags dictionary
+    """
+    def checked_handler(arguments: [str], flags: {str : str}):
+        if arguments:
+            raise SyntaxError(f"too many arguments given to {command}\n\n{HELP_MESSAGE}")
+
+        handler(flags)
+
+    return checked_handler
+
+
+# Command name -> handler, each called with the sequential arguments
+# following the command name and the flags dictionary
+_COMMANDS = {
+    "delete-experiment":   lambda arguments, flags: delete_experiment(arguments),
+    "help":                _without_arguments("help", lambda flags: print(HELP_MESSAGE)),
+    "list-backups":        _without_arguments("list-backups", list_database_backups),
+    "new-experiment":      lambda arguments, flags: create_new_experiment(arguments),
+    "restore-from-backup": lambda arguments, flags: restore_from_backup(arguments),
+}
+
+
 if __name__ == "__main__":
     args, flags = parse_arguments(sys.argv[1:])
 
-    match args:
-        case ["delete-experiment"]:
-            delete_experiment(flags)
-        case ["help"]:
-            print(HELP_MESSAGE)
-        case ["list-backups"]:
-            list_database_backups(args[1:])
-        case ["new-experiment"]:
-            create_new_experiment(args[1:])
-        case ["restore-from-backup"]:
-            restore_from_backup(args)
-        case [command]:
-            raise EnvironmentError(f"Unknown command {command}\n\n{HELP_MESSAGE}")
-        case []:
-            raise EnvironmentError(f"No command given\n\n{HELP_MESSAGE}")
-        case _:
-            raise EnvironmentError(f"Too many arguments\n\n{HELP_MESSAGE}")
+    if not args:
+        raise EnvironmentError(f"No command given\n\n{HELP_MESSAGE}")
+
+    command, *arguments = args
+
+    if (handler := _COMMANDS.get(command)) is None:
+        raise EnvironmentError(f"Unknown command {command}\n\n{HELP_MESSAGE}")
+
+    handler(arguments, flags)